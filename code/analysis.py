@@ -5,12 +5,11 @@ Post-processing functions like acceleration analysis.
 """
 import numpy as np
 from scipy.interpolate import CubicSpline
-from scipy.optimize import brentq
 import logging
 from typing import Optional, Tuple
 import config
 from config import BuoyProperties
-from dynamics import buoy_equation_of_motion
+from wave_processing import create_forcing_function
 
 logger = logging.getLogger(__name__)
 
@@ -22,38 +21,32 @@ def find_max_acceleration(t_eval: np.ndarray, z_optimal: np.ndarray,
     logger.info("Finding maximum acceleration...")
  
     try:
-        # Recalculates acceleration at every point in optimal simulation
-        z_double_dot = np.array([
-            # Call ODE function for each time step
-            buoy_equation_of_motion(t, [z, z_dot], m_buoy, c_pto, buoy_props)[1]
-            for t, z, z_dot in zip(t_eval, z_optimal, z_dot_optimal)
-        ])
+        # Recalculates acceleration at every point in optimal simulation (vectorized)
+        F_wave = create_forcing_function(t_eval, buoy_props.k_hydrostatic)
+        F_total = F_wave - buoy_props.k_hydrostatic * z_optimal - c_pto * z_dot_optimal
+        if config.RADIATION_DAMPING:
+            F_total -= buoy_props.c_rad * z_dot_optimal
+        if config.VISCOUS_DRAG:
+            # |v|*v computed in place as copysign(v², v) to avoid extra temporaries
+            drag = np.multiply(z_dot_optimal, z_dot_optimal)
+            np.copysign(drag, z_dot_optimal, out=drag)
+            drag *= buoy_props.k_drag
+            F_total -= drag
+        z_double_dot = F_total / (m_buoy + buoy_props.m_added)
     
         # Create continuous spline function from discrete acceleration points
         accel_spline = CubicSpline(t_eval, z_double_dot)
         jerk_spline = accel_spline.derivative()
     
-        # Evaluates the jerk (derivative of acceleration) at each time step 
-        jerk_values = jerk_spline(t_eval)
-        sign_changes = np.where(np.diff(np.sign(jerk_values)))[0]
-        
-        # List for times of acceleration peaks
-        jerk_roots = []
-    
-        # Loop through each location where the sign changed 
-        for i in sign_changes:
-            try:
-                root = brentq(jerk_spline, t_eval[i], t_eval[i+1], xtol=1e-6)
-                jerk_roots.append(root)
-            except ValueError:
-                pass  # No root in this interval
+        # Finds every real root of the piecewise-quadratic jerk spline in one call
+        jerk_roots = jerk_spline.roots(extrapolate=False)
+        jerk_roots = jerk_roots[~np.isnan(jerk_roots)]
         
         if len(jerk_roots) == 0:
             logger.warning("No jerk roots found")
             return None, None
         
         # Filter to steady state
-        jerk_roots = np.array(jerk_roots)
         steady_mask = jerk_roots > (t_eval[0] + config.STEADY_STATE_CUTOFF)
         roots_steady = jerk_roots[steady_mask]
         
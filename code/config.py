@@ -5,7 +5,7 @@ Contains constants and shared data structures
 
 """
 import numpy as np
-from dataclasses import dataclass
+from typing import NamedTuple
 
 # Constants
 G = 9.81
@@ -23,6 +23,7 @@ OPTIMIZATION_PENALTY = 1e10
 STEADY_STATE_CUTOFF = 50.0  # seconds
 EVAL_POINTS = 2000
 MAX_TIMESTEP = 0.5          # seconds
+ODE_METHOD = 'RK4'          # 'RK4' (compiled, fixed step on the wave grid), 'RK45', or an implicit method ('LSODA', 'BDF', 'Radau') using the analytic Jacobian
 
 # Minimum and maximum values to test
 MASS_BOUNDS = (20000.0, 200000.0) # (min_mass, max_mass) in kg
@@ -32,21 +33,33 @@ DAMPING_BOUNDS = (10000.0, 1000000.0) # (min_damping, max_damping)
 MAX_DISPLACEMENT = 3.5 # Max distance the buoy can move vertically (meters)
 MAX_PTO_FORCE = 1_000_000.0 # Max force the generator can withstand (Newtons)
 
+# Plotting
+INTERACTIVE_PLOTS = True # Show plot windows; False renders headless with the Agg backend and only saves to file
+MAX_PLOT_POINTS = 4000 # Longer line series are stride-decimated for display (about twice the figure width in pixels)
+
 # Generate lists to be filled with data from wave data file
 
 # For high detail wave data (resampled)
 WAVE_TIME = np.array([])
 WAVE_VERTICAL_DISPLACEMENT = np.array([])
+WAVE_DT = 0.0  # Exact spacing of the resampled grid (seconds)
+
+# Start and end time of the wave record (seconds)
+T0 = 0.0
+T1 = 0.0
 
 # For original, low detail wave data
 WAVE_TIME_COARSE = np.array([])
-WAVE_VERTICAL_DISPLACEMENTCEMENT_COARSE = np.array([])
+WAVE_VERTICAL_DISPLACEMENT_COARSE = np.array([])
 wave_interp = None  # Will hold interpolation function
 
+# Output sample times and steady-state mask, cached once the wave data is loaded
+T_EVAL = np.array([])
+STEADY_MASK = np.array([], dtype=bool)
+
 # Data Classes
-""" Container for buoy physical properties """
-@dataclass
-class BuoyProperties:
+""" Container for buoy physical properties (immutable, hashable and supported natively by Numba) """
+class BuoyProperties(NamedTuple):
     
     diameter: float         # meters
     height: float           # meters (draft)
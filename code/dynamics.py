@@ -4,29 +4,122 @@ Defines the equation of motion for the buoy
 
 """
 import numpy as np
+from typing import Callable, Tuple
 import config
 from config import BuoyProperties
-from wave_processing import create_forcing_function
-
-""" Buoy equation of motion with enhanced physics """
-def buoy_equation_of_motion(t: float, y: np.ndarray, m_buoy: float, c_pto: float, 
-                           buoy_props: BuoyProperties) -> list:
-    
-    z, z_dot = y
-    
-    # Total effective mass
-    m_total = m_buoy + buoy_props.m_added
-    
-    # Calculate forces
-    F_wave = create_forcing_function(t, buoy_props.k_hydrostatic)
-    F_hydrostatic = -buoy_props.k_hydrostatic * z
-    F_pto = -c_pto * z_dot
-    
-    F_radiation = -buoy_props.c_rad * z_dot if config.RADIATION_DAMPING else 0.0
-    F_drag = -buoy_props.k_drag * np.abs(z_dot) * z_dot if config.VISCOUS_DRAG else 0.0
-    
+from jit import njit
+from wave_processing import wave_forcing
+
+""" Compiled scalar acceleration kernel (buoy properties passed as plain floats) """
+@njit(cache=True, fastmath=True)
+def buoy_acceleration(z: float, z_dot: float, F_wave: float, inv_m_total: float,
+                      k_hydrostatic: float, c_linear: float, k_drag: float) -> float:
+
+    F_hydrostatic = -k_hydrostatic * z
+    F_damping = -c_linear * z_dot # PTO and radiation damping
+    F_drag = -k_drag * abs(z_dot) * z_dot
+
     # Total force and acceleration
-    F_total = F_wave + F_hydrostatic + F_pto + F_radiation + F_drag
-    z_double_dot = F_total / m_total
-    
-    return [z_dot, z_double_dot]
+    F_total = F_wave + F_hydrostatic + F_damping + F_drag
+    return F_total * inv_m_total
+
+""" Compiled equation of motion: wave forcing and acceleration in a single call (not cached,
+it calls wave_forcing from wave_processing) """
+@njit(fastmath=True)
+def buoy_rhs(t: float, z: float, z_dot: float, wave_grid: Tuple[float, float, float], wave_elevation: np.ndarray,
+             inv_m_total: float, k_hydrostatic: float, c_linear: float, k_drag: float) -> Tuple[float, float]:
+
+    F_wave = wave_forcing(t, wave_grid, wave_elevation, k_hydrostatic)
+    return z_dot, buoy_acceleration(z, z_dot, F_wave, inv_m_total, k_hydrostatic, c_linear, k_drag)
+
+""" Compiled equation of motion for a stacked population state [z_0..z_n-1, z_dot_0..z_dot_n-1]
+(not cached, it calls wave_forcing from wave_processing) """
+@njit(fastmath=True)
+def buoy_rhs_batch(t: float, y: np.ndarray, wave_grid: Tuple[float, float, float], wave_elevation: np.ndarray,
+                   inv_m_total: np.ndarray, k_hydrostatic: float, c_linear: np.ndarray,
+                   k_drag: float) -> np.ndarray:
+
+    n = y.size // 2
+    dydt = np.empty_like(y)
+
+    # Every buoy sees the same wave forcing
+    F_wave = wave_forcing(t, wave_grid, wave_elevation, k_hydrostatic)
+    for i in range(n):
+        dydt[i] = y[n + i]
+        dydt[n + i] = buoy_acceleration(y[i], y[n + i], F_wave, inv_m_total[i],
+                                        k_hydrostatic, c_linear[i], k_drag)
+    return dydt
+
+""" Folds the physics switches into the linear damping and drag coefficients """
+def effective_damping(c_pto: float, buoy_props: BuoyProperties) -> Tuple[float, float]:
+
+    c_linear = c_pto + (buoy_props.c_rad if config.RADIATION_DAMPING else 0.0)
+    k_drag = buoy_props.k_drag if config.VISCOUS_DRAG else 0.0
+    return c_linear, k_drag
+
+""" Builds the equation of motion for one (mass, damping) pair with its constants precomputed """
+def make_rhs(m_buoy: float, c_pto: float, buoy_props: BuoyProperties) -> Callable:
+
+    inv_m_total = 1.0 / (m_buoy + buoy_props.m_added)
+    k_hydrostatic = buoy_props.k_hydrostatic
+    c_linear, k_drag = effective_damping(c_pto, buoy_props)
+    wave_grid = (config.T0, config.T1, config.WAVE_DT)
+    wave_elevation = config.WAVE_VERTICAL_DISPLACEMENT
+
+    # One compiled call per solver step
+    def rhs(t: float, y: np.ndarray) -> tuple:
+        return buoy_rhs(t, y[0], y[1], wave_grid, wave_elevation,
+                        inv_m_total, k_hydrostatic, c_linear, k_drag)
+
+    return rhs
+
+""" Builds the analytic Jacobian of the equation of motion, used by the implicit solvers """
+def make_jacobian(m_buoy: float, c_pto: float, buoy_props: BuoyProperties) -> Callable:
+
+    m_total = m_buoy + buoy_props.m_added
+    c_linear, k_drag = effective_damping(c_pto, buoy_props)
+    dz = -buoy_props.k_hydrostatic / m_total
+
+    def jacobian(t: float, y: np.ndarray) -> np.ndarray:
+        # d(z_double_dot)/d(z_dot) includes the derivative of the quadratic drag
+        dz_dot = -(c_linear + 2.0 * k_drag * abs(y[1])) / m_total
+        return np.array([[0.0, 1.0], [dz, dz_dot]])
+
+    return jacobian
+
+""" Builds the equation of motion for a population of (mass, damping) pairs simulated together """
+def make_rhs_batch(m_buoy: np.ndarray, c_pto: np.ndarray, buoy_props: BuoyProperties) -> Callable:
+
+    inv_m_total = np.ascontiguousarray(1.0 / (m_buoy + buoy_props.m_added), dtype=np.float64)
+    k_hydrostatic = buoy_props.k_hydrostatic
+    c_linear, k_drag = effective_damping(c_pto, buoy_props)
+    c_linear = np.ascontiguousarray(c_linear, dtype=np.float64)
+    wave_grid = (config.T0, config.T1, config.WAVE_DT)
+    wave_elevation = config.WAVE_VERTICAL_DISPLACEMENT
+
+    def rhs(t: float, y: np.ndarray) -> np.ndarray:
+        return buoy_rhs_batch(t, y, wave_grid, wave_elevation,
+                              inv_m_total, k_hydrostatic, c_linear, k_drag)
+
+    return rhs
+
+""" Builds the block-diagonal analytic Jacobian for a population simulated together """
+def make_jacobian_batch(m_buoy: np.ndarray, c_pto: np.ndarray, buoy_props: BuoyProperties) -> Callable:
+
+    m_total = m_buoy + buoy_props.m_added
+    c_linear, k_drag = effective_damping(c_pto, buoy_props)
+    n = len(m_total)
+    idx = np.arange(n)
+
+    jac = np.zeros((2 * n, 2 * n))
+    jac[idx, n + idx] = 1.0
+    jac[n + idx, idx] = -buoy_props.k_hydrostatic / m_total
+
+    def jacobian(t: float, y: np.ndarray) -> np.ndarray:
+        jac[n + idx, n + idx] = -(c_linear + 2.0 * k_drag * np.abs(y[n:])) / m_total
+        return jac.copy()
+
+    return jacobian
+
+# Compile once at import so the first simulation doesn't pay the JIT cost
+buoy_acceleration(0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
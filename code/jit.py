@@ -0,0 +1,19 @@
+"""
+JIT module.
+Optional Numba compilation for the numerical kernels.
+
+Kernels that call compiled functions from another module must not use cache=True: Numba's
+on-disk cache only tracks the kernel's own source file, so it would keep serving stale code
+after such a callee is edited.
+
+"""
+try:
+    from numba import njit, prange
+except ImportError:
+    """ Fallback decorator used when Numba is not installed (runs the plain Python function) """
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    prange = range
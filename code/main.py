@@ -4,7 +4,7 @@ Performs the optimization and simulation process.
 
 """
 import numpy as np
-from scipy.optimize import minimize, differential_evolution
+from scipy.optimize import differential_evolution
 import sys
 import logging
 
@@ -13,7 +13,7 @@ import config
 from wave_processing import analyze_and_prepare_wave_data, create_forcing_function
 from physics import create_buoy_properties
 from simulation import run_simulation
-from optimization import objective_function
+from optimization import objective_function_batch
 from analysis import find_max_acceleration
 from visualization import plot_results
 
@@ -63,8 +63,9 @@ def main():
     logger.info(f"\nStarting optimization (Differential Evolution)...")
     logger.info(f"Initial guess: m={x0[0]:.0f} kg, c={x0[1]:.0f} Ns/m")
     
+    # The whole population is scored in one objective call (see objective_function_batch)
     result = differential_evolution(
-        objective_function,
+        objective_function_batch,
         bounds,
         args=(buoy_props,),
         strategy='best1bin', # The standard strategy
@@ -72,7 +73,10 @@ def main():
         popsize=5, # Population size 
         tol=0.1, # Tolerance for convergence
         seed=18,
-        disp=True # Print progress
+        disp=True, # Print progress
+        vectorized=True, # Whole population per objective call
+        updating='deferred', # Required for vectorized evaluation
+        polish=False # Skip the serial L-BFGS-B refinement
     )
     
     if result.success:
@@ -97,10 +101,9 @@ def main():
         
         if sol.success:
             # Evaluate solution for plotting
-            t_eval = np.linspace(config.WAVE_TIME[0], config.WAVE_TIME[-1], config.EVAL_POINTS)
-            z_optimal = sol.sol(t_eval)[0]
-            z_dot_optimal = sol.sol(t_eval)[1]
-            forcing = np.array([create_forcing_function(t, buoy_props.k_hydrostatic) for t in t_eval])
+            t_eval = sol.t
+            z_optimal, z_dot_optimal = sol.y
+            forcing = create_forcing_function(t_eval, buoy_props.k_hydrostatic)
             
             max_accel_t, max_accel_a = find_max_acceleration(
                 t_eval, z_optimal, z_dot_optimal, opt_mass, opt_damping, buoy_props
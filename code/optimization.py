@@ -7,62 +7,96 @@ import numpy as np
 import logging
 import config  
 from config import BuoyProperties
-from simulation import run_simulation
+from jit import njit, prange
+from dynamics import effective_damping
+from simulation import integrate_rk4, run_simulation_batch
 
-""" Runs a full simulation ith a given set of parameters and returns a score to be minimized """
 logger = logging.getLogger(__name__)
 
-def objective_function(params: np.ndarray, buoy_props: BuoyProperties) -> float:
-    
+""" Single pass over a sampled trajectory: checks the limits and averages the steady-state
+mechanical power. Returns -1.0 if a limit is breached or there is no steady-state sample """
+@njit(cache=True, fastmath=True)
+def score_trajectory(z: np.ndarray, z_dot: np.ndarray, steady_mask: np.ndarray, c_pto: float,
+                     max_displacement: float, max_pto_force: float) -> float:
+
+    total = 0.0
+    count = 0
+    for i in range(z.size):
+        if abs(z[i]) > max_displacement or abs(c_pto * z_dot[i]) > max_pto_force:
+            return -1.0
+        if steady_mask[i]:
+            total += c_pto * z_dot[i] * z_dot[i]
+            count += 1
+    if count == 0:
+        return -1.0
+    return total / count
+
+""" Simulates and scores a whole population in parallel with the compiled RK4 integrator.
+Returns the average mechanical power of each candidate, -1.0 where a limit is breached
+(not cached, it calls integrate_rk4 from simulation) """
+@njit(parallel=True)
+def score_population_rk4(t_eval: np.ndarray, steady_mask: np.ndarray, t_start: float, dt: float,
+                         wave_elevation: np.ndarray, inv_m_total: np.ndarray, k_hydrostatic: float,
+                         c_linear: np.ndarray, k_drag: float, c_pto: np.ndarray,
+                         max_displacement: float, max_pto_force: float) -> np.ndarray:
+
+    avg_power = np.empty(c_pto.size)
+    for i in prange(c_pto.size):
+        # An early stop ends on the breaching sample, so score_trajectory alone decides
+        # feasibility, exactly as for the solve_ivp path
+        z, z_dot = integrate_rk4(t_eval, t_start, dt, wave_elevation, inv_m_total[i],
+                                 k_hydrostatic, c_linear[i], k_drag, c_pto[i],
+                                 max_displacement, max_pto_force, True)
+        avg_power[i] = score_trajectory(z, z_dot, steady_mask, c_pto[i],
+                                        max_displacement, max_pto_force)
+    return avg_power
+
+""" Scores a whole population in one call (params has shape (2, npop)): the compiled RK4 integrator runs
+the candidates in parallel, the SciPy methods simulate them as one stacked ODE system """
+def objective_function_batch(params: np.ndarray, buoy_props: BuoyProperties) -> np.ndarray:
+
     m_buoy, c_pto = params
-    
+    scores = np.full(m_buoy.shape, config.OPTIMIZATION_PENALTY)
+
     # Check bounds
-    if not (config.MASS_BOUNDS[0] <= m_buoy <= config.MASS_BOUNDS[1]):
-        return config.OPTIMIZATION_PENALTY
-    if not (config.DAMPING_BOUNDS[0] <= c_pto <= config.DAMPING_BOUNDS[1]):
-        return config.OPTIMIZATION_PENALTY
-    
-    # Run simulation
-    sol = run_simulation(m_buoy, c_pto, buoy_props)
-    
-    if not sol.success:
-        logger.warning(f"ODE solver failed: {sol.message}")
-        return config.OPTIMIZATION_PENALTY
-    
-    # Evaluate solution
-    t_eval = np.linspace(config.WAVE_TIME[0], config.WAVE_TIME[-1], config.EVAL_POINTS)
-    z = sol.sol(t_eval)[0]
-    z_dot = sol.sol(t_eval)[1]
-    
-    # Check constraints
-    if np.any(np.abs(z) > config.MAX_DISPLACEMENT):
-        return config.OPTIMIZATION_PENALTY
-    
-    pto_force = np.abs(c_pto * z_dot)
-    if np.any(pto_force > config.MAX_PTO_FORCE):
-        return config.OPTIMIZATION_PENALTY
-    
-    # Calculate power (from steady state only)
-    t_start = config.WAVE_TIME[0]
-    steady_state_mask = t_eval > (t_start + config.STEADY_STATE_CUTOFF)
-    z_dot_steady = z_dot[steady_state_mask]
-    
-    if len(z_dot_steady) == 0:
-        return config.OPTIMIZATION_PENALTY
-    
-    # Mechanical power
-    instant_power_mechanical = c_pto * (z_dot_steady**2)
-    
-    # Apply PTO efficiency
-    if config.PTO_EFFICIENCY:
-        instant_power_electrical = buoy_props.eta_pto * instant_power_mechanical
+    in_bounds = ((config.MASS_BOUNDS[0] <= m_buoy) & (m_buoy <= config.MASS_BOUNDS[1]) &
+                 (config.DAMPING_BOUNDS[0] <= c_pto) & (c_pto <= config.DAMPING_BOUNDS[1]))
+    if not np.any(in_bounds):
+        return scores
+    m_buoy, c_pto = m_buoy[in_bounds], c_pto[in_bounds]
+
+    if config.ODE_METHOD == 'RK4':
+        # One compiled call for the whole population, candidates run on all cores
+        c_linear, k_drag = effective_damping(c_pto, buoy_props)
+        avg_power = score_population_rk4(
+            config.T_EVAL, config.STEADY_MASK, config.T0, config.WAVE_DT,
+            config.WAVE_VERTICAL_DISPLACEMENT, 1.0 / (m_buoy + buoy_props.m_added),
+            buoy_props.k_hydrostatic, np.ascontiguousarray(c_linear, dtype=np.float64), k_drag,
+            np.ascontiguousarray(c_pto, dtype=np.float64), config.MAX_DISPLACEMENT, config.MAX_PTO_FORCE
+        )
     else:
-        instant_power_electrical = instant_power_mechanical
-    
-    avg_power = np.mean(instant_power_electrical)
-    
-    # Only prints if average power is non-negligable
-    if avg_power > 1e-3:
-        logger.info(f"Testing: m={m_buoy:.0f} kg, c={c_pto:.0f} Ns/m -> Power={avg_power/1000.0:.1f} kW")
-    
-    return -avg_power
\ No newline at end of file
+        # Run simulation
+        sol = run_simulation_batch(m_buoy, c_pto, buoy_props)
+
+        if not sol.success:
+            logger.warning(f"ODE solver failed: {sol.message}")
+            return scores
+
+        # Check constraints and average power for each candidate (one row each)
+        n = len(m_buoy)
+        avg_power = np.array([
+            score_trajectory(sol.y[i], sol.y[n + i], config.STEADY_MASK, c_pto[i],
+                             config.MAX_DISPLACEMENT, config.MAX_PTO_FORCE)
+            for i in range(n)
+        ])
+    feasible = avg_power >= 0.0
+    if config.PTO_EFFICIENCY:
+        avg_power *= buoy_props.eta_pto
+
+    if logger.isEnabledFor(logging.INFO):
+        for m, c, p, ok in zip(m_buoy, c_pto, avg_power, feasible):
+            if ok and p > 1e-3:
+                logger.info("Testing: m=%.0f kg, c=%.0f Ns/m -> Power=%.1f kW", m, c, p/1000.0)
+
+    scores[in_bounds] = np.where(feasible, -avg_power, config.OPTIMIZATION_PENALTY)
+    return scores
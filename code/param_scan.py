@@ -6,7 +6,7 @@ Parameter sweep script for the wave energy buoy model.
 This script:
   1. Loads the wave elevation data and creates the buoy properties.
   2. Sweeps buoy mass (within MASS_BOUNDS) and PTO damping (within a valid range).
-  3. Evaluates the average electrical power using the existing objective_function.
+  3. Evaluates the average electrical power for the whole grid with objective_function_batch.
   4. Filters out penalised (invalid) cases.
   5. Plots power vs mass:
         - 8 PTO damping values in total (monotonically increasing),
@@ -17,14 +17,16 @@ import sys
 import logging
 
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.lines import Line2D
 
 import config
 from config import OPTIMIZATION_PENALTY
 from wave_processing import analyze_and_prepare_wave_data
 from physics import create_buoy_properties
-from optimization import objective_function
+from optimization import objective_function_batch
 
 # Configure logging
 logging.basicConfig(
@@ -34,40 +36,53 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def plot_power_curves(df: pd.DataFrame, damping_subset, title: str):
+def plot_power_curves(mass: np.ndarray, damping: np.ndarray, power: np.ndarray,
+                      damping_subset, title: str):
     """
     Plot power vs mass for a subset of PTO damping values.
 
     Parameters
     ----------
-    df : pandas.DataFrame
-        Must contain columns: 'mass', 'damping', 'power' (kW).
+    mass, damping, power : numpy.ndarray
+        Sweep results (power in kW), sorted by damping and then by mass
+        (see np.lexsort), so each damping curve is a contiguous slice.
     damping_subset : list or array of float
         The damping values to include in this figure.
     title : str
         Title of the figure.
     """
     plt.figure(figsize=(8, 6))
+    ax = plt.gca()
+    cycle = plt.rcParams["axes.prop_cycle"].by_key()["color"]
 
+    segments = []
+    labels = []
     for c in damping_subset:
-        group = df[df["damping"] == c].sort_values("mass")
+        lo = np.searchsorted(damping, c, side="left")
+        hi = np.searchsorted(damping, c, side="right")
 
-        if group.empty:
+        if lo == hi:
             continue  # No valid points for this damping
 
-        plt.plot(
-            group["mass"],
-            group["power"],
-            marker="o",
-            linestyle="-",
-            label=f"c = {c:,.0f} Ns/m",
-        )
+        segments.append(np.column_stack((mass[lo:hi], power[lo:hi])))
+        labels.append(f"c = {c:,.0f} Ns/m")
+
+    # All curves as one LineCollection, all markers as one scatter
+    colors = to_rgba_array([cycle[i % len(cycle)] for i in range(len(segments))])
+    if segments:
+        points = np.concatenate(segments)
+        ax.add_collection(LineCollection(segments, colors=colors))
+        ax.scatter(points[:, 0], points[:, 1], zorder=3,
+                   c=np.repeat(colors, [len(seg) for seg in segments], axis=0))
+        ax.autoscale_view()
+
+    handles = [Line2D([], [], color=col, marker="o") for col in colors]
 
     plt.xlabel("Buoy mass (kg)")
     plt.ylabel("Average electrical power (kW)")
     plt.title(title)
     plt.grid(True)
-    plt.legend(title="PTO damping")
+    plt.legend(handles, labels, title="PTO damping")
     plt.tight_layout()
     plt.show()
 
@@ -113,54 +128,56 @@ def main():
     logger.info(f"Scanning masses:   {masses}")
     logger.info(f"Scanning dampings: {dampings}")
 
-    mass_values = []
-    damping_values = []
-    power_values = []
+    # Preallocated result columns, one slot per (damping, mass) pair:
+    # idx = i_damping * len(masses) + i_mass
+    n_points = len(dampings) * len(masses)
+    mass_arr = np.tile(masses, len(dampings))
+    damping_arr = np.repeat(dampings, len(masses))
 
     # ---------------------------------------------------------
-    # 4. Parameter sweep: for each (mass, damping) evaluate power
+    # 4. Parameter sweep: evaluate the whole flattened grid as one
+    #    population (the compiled simulator runs it on all cores)
     # ---------------------------------------------------------
-    for c in dampings:
-        for m in masses:
-            x = [m, c]
-
-            f_val = objective_function(x, buoy_props)
-
-            # Skip penalised (invalid) cases
-            if f_val >= OPTIMIZATION_PENALTY * 0.5:
-                logger.warning(
-                    f"Skipping penalised case m={m:.0f} kg, c={c:.0f} Ns/m "
-                    f"(objective = {f_val:.2e})"
-                )
-                continue
-
-            # objective_function returns -avg_power in Watts
-            power_W = -f_val
-            power_kW = power_W / 1000.0
-
-            logger.info(
-                f"Recorded: m={m:.0f} kg, c={c:.0f} Ns/m -> Power={power_kW:.1f} kW"
+    f_vals = objective_function_batch(np.vstack((mass_arr, damping_arr)), buoy_props)
+
+    # Skip penalised (invalid) cases; objective_function_batch returns -avg_power in Watts
+    valid = f_vals < OPTIMIZATION_PENALTY * 0.5
+    power_arr = -f_vals / 1000.0
+
+    for idx in range(n_points):
+        m, c = mass_arr[idx], damping_arr[idx]
+        if not valid[idx]:
+            logger.warning(
+                f"Skipping penalised case m={m:.0f} kg, c={c:.0f} Ns/m "
+                f"(objective = {f_vals[idx]:.2e})"
             )
+            continue
 
-            mass_values.append(m)
-            damping_values.append(c)
-            power_values.append(power_kW)
+        logger.info(
+            f"Recorded: m={m:.0f} kg, c={c:.0f} Ns/m -> Power={power_arr[idx]:.1f} kW"
+        )
 
     # ---------------------------------------------------------
-    # 5. Build DataFrame and generate two figures
+    # 5. Sort by (damping, mass) once and generate two figures
     # ---------------------------------------------------------
-    if len(mass_values) == 0:
+    if not valid.any():
         logger.error("No valid (mass, damping) combinations were found!")
         return
 
-    df = pd.DataFrame({
-        "mass": mass_values,
-        "damping": damping_values,
-        "power": power_values,
-    })
+    # Best feasible grid point, picked without a tracked-maximum loop
+    best = np.argmax(np.where(valid, power_arr, -np.inf))
+    logger.info(
+        f"Best grid point: m={mass_arr[best]:.0f} kg, c={damping_arr[best]:.0f} Ns/m "
+        f"-> Power={power_arr[best]:.1f} kW"
+    )
+
+    mass_arr, damping_arr, power_arr = mass_arr[valid], damping_arr[valid], power_arr[valid]
+
+    order = np.lexsort((mass_arr, damping_arr))
+    mass_s, damping_s, power_s = mass_arr[order], damping_arr[order], power_arr[order]
 
-    # Sort and split the 8 damping values into two groups of 4
-    unique_dampings = sorted(df["damping"].unique())
+    # Split the 8 damping values into two groups of 4
+    unique_dampings = np.unique(damping_s)
     if len(unique_dampings) < 8:
         logger.warning(
             f"Expected 8 unique damping values, but found {len(unique_dampings)}."
@@ -171,14 +188,14 @@ def main():
 
     # First figure: lower half of the damping range
     plot_power_curves(
-        df,
+        mass_s, damping_s, power_s,
         first_half,
         title="Average power vs mass (lower PTO damping range)"
     )
 
     # Second figure: upper half of the damping range
     plot_power_curves(
-        df,
+        mass_s, damping_s, power_s,
         second_half,
         title="Average power vs mass (higher PTO damping range)"
     )
@@ -4,10 +4,12 @@ Calculates hydrodynamic coefficients and properties
 
 """
 import numpy as np
+from functools import lru_cache
 import config
 from config import BuoyProperties
 
 """ Calculates hydrodynamic added mass """
+@lru_cache(maxsize=None)
 def calculate_added_mass(buoy_diameter: float, buoy_height: float) -> float:
     
     buoy_radius = buoy_diameter / 2.0
@@ -16,12 +18,14 @@ def calculate_added_mass(buoy_diameter: float, buoy_height: float) -> float:
     return m_added
 
 """ Estimates radiation damping coefficient at specific frequency """
+@lru_cache(maxsize=None)
 def calculate_radiation_damping(buoy_diameter: float, omega_peak: float = 0.8) -> float:
     
     c_rad = (config.RHO_WATER * config.G * buoy_diameter**2) / (2.0 * omega_peak)
     return c_rad
 
 """ Calculates viscous drag coefficient """
+@lru_cache(maxsize=None)
 def calculate_viscous_drag_coefficient(buoy_diameter: float) -> float:
     
     C_d = 1.0  # Typical for bluff body
@@ -29,7 +33,8 @@ def calculate_viscous_drag_coefficient(buoy_diameter: float) -> float:
     k_drag = 0.5 * config.RHO_WATER * C_d * area
     return k_drag
 
-""" Create a BuoyProperties object with all calculated parameters """
+""" Create a BuoyProperties object with all calculated parameters (cached; the result is immutable) """
+@lru_cache(maxsize=32)
 def create_buoy_properties(diameter: float, height: float, eta_pto: float = 0.90) -> BuoyProperties:
 
     area = np.pi * (diameter / 2.0)**2
@@ -5,29 +5,124 @@ Handles the execution of the ODE solver.
 """
 import numpy as np
 from scipy.integrate import solve_ivp
+from scipy.optimize import OptimizeResult
+from typing import Tuple
 import logging
 import config
-from dynamics import buoy_equation_of_motion
+from dynamics import (buoy_acceleration, effective_damping, make_rhs, make_jacobian,
+                      make_rhs_batch, make_jacobian_batch)
 from config import BuoyProperties
+from jit import njit
 
 logger = logging.getLogger(__name__)
 
-""" Runs the buoy simulation using scipy.integrate.solve_ivp """
+# Solvers that make use of the analytic Jacobian
+IMPLICIT_METHODS = ('LSODA', 'BDF', 'Radau')
+
+""" Compiled fixed-step RK4 integration on the resampled wave grid, sampled at t_eval by cubic
+Hermite interpolation. With stop_at_limits, the output is cut short at the first sample that breaches
+a physical limit (not cached, it calls buoy_acceleration from dynamics) """
+@njit(fastmath=True)
+def integrate_rk4(t_eval: np.ndarray, t_start: float, dt: float, wave_elevation: np.ndarray,
+                  inv_m_total: float, k_hydrostatic: float, c_linear: float, k_drag: float,
+                  c_pto: float, max_displacement: float, max_pto_force: float,
+                  stop_at_limits: bool) -> Tuple[np.ndarray, np.ndarray]:
+
+    n_out = t_eval.size
+    z_out = np.empty(n_out)
+    z_dot_out = np.empty(n_out)
+
+    z = 0.0
+    z_dot = 0.0
+    F_wave = k_hydrostatic * wave_elevation[0]
+    accel = buoy_acceleration(z, z_dot, F_wave, inv_m_total, k_hydrostatic, c_linear, k_drag)
+
+    j = 0
+    while j < n_out and t_eval[j] <= t_start:
+        z_out[j] = z
+        z_dot_out[j] = z_dot
+        j += 1
+
+    for i in range(wave_elevation.size - 1):
+        # Steps line up with the wave grid, so the forcing is linear within each step
+        t = t_start + i * dt
+        F_mid = 0.5 * k_hydrostatic * (wave_elevation[i] + wave_elevation[i + 1])
+        F_next = k_hydrostatic * wave_elevation[i + 1]
+
+        k1_z = z_dot
+        k1_v = accel
+        k2_z = z_dot + 0.5 * dt * k1_v
+        k2_v = buoy_acceleration(z + 0.5 * dt * k1_z, k2_z, F_mid, inv_m_total, k_hydrostatic, c_linear, k_drag)
+        k3_z = z_dot + 0.5 * dt * k2_v
+        k3_v = buoy_acceleration(z + 0.5 * dt * k2_z, k3_z, F_mid, inv_m_total, k_hydrostatic, c_linear, k_drag)
+        k4_z = z_dot + dt * k3_v
+        k4_v = buoy_acceleration(z + dt * k3_z, k4_z, F_next, inv_m_total, k_hydrostatic, c_linear, k_drag)
+
+        z_new = z + dt / 6.0 * (k1_z + 2.0 * k2_z + 2.0 * k3_z + k4_z)
+        z_dot_new = z_dot + dt / 6.0 * (k1_v + 2.0 * k2_v + 2.0 * k3_v + k4_v)
+        accel_new = buoy_acceleration(z_new, z_dot_new, F_next, inv_m_total, k_hydrostatic, c_linear, k_drag)
+
+        # Cubic Hermite output for every sample time inside this step
+        while j < n_out and t_eval[j] <= t + dt:
+            s = (t_eval[j] - t) / dt
+            h00 = (1.0 + 2.0 * s) * (1.0 - s)**2
+            h10 = s * (1.0 - s)**2
+            h01 = s**2 * (3.0 - 2.0 * s)
+            h11 = s**2 * (s - 1.0)
+            z_out[j] = h00 * z + h10 * dt * z_dot + h01 * z_new + h11 * dt * z_dot_new
+            z_dot_out[j] = h00 * z_dot + h10 * dt * accel + h01 * z_dot_new + h11 * dt * accel_new
+            j += 1
+
+            # Same rule as the post-hoc check: only sampled points decide feasibility
+            if stop_at_limits and (abs(z_out[j - 1]) > max_displacement or
+                                   abs(c_pto * z_dot_out[j - 1]) > max_pto_force):
+                return z_out[:j], z_dot_out[:j]
+
+        z, z_dot, accel = z_new, z_dot_new, accel_new
+
+    # Sample times at the very end of the record (rounding in t + dt)
+    while j < n_out:
+        z_out[j] = z
+        z_dot_out[j] = z_dot
+        j += 1
+
+    return z_out, z_dot_out
+
+""" Runs the buoy simulation with the compiled fixed-step RK4 integrator (mirrors the solve_ivp result) """
+def run_simulation_rk4(m_buoy: float, c_pto: float, buoy_props: BuoyProperties) -> OptimizeResult:
+
+    c_linear, k_drag = effective_damping(c_pto, buoy_props)
+    z, z_dot = integrate_rk4(
+        config.T_EVAL, config.T0, config.WAVE_DT, config.WAVE_VERTICAL_DISPLACEMENT,
+        1.0 / (m_buoy + buoy_props.m_added), buoy_props.k_hydrostatic, c_linear, k_drag,
+        c_pto, config.MAX_DISPLACEMENT, config.MAX_PTO_FORCE, False
+    )
+    return OptimizeResult(t=config.T_EVAL, y=np.vstack((z, z_dot)), status=0, success=True,
+                          message="The solver successfully reached the end of the integration interval.")
+
+""" Runs the buoy simulation with the solver selected by config.ODE_METHOD: the compiled RK4 integrator
+by default, otherwise scipy.integrate.solve_ivp """
 def run_simulation(m_buoy: float, c_pto: float, buoy_props: BuoyProperties):
    
+    if config.ODE_METHOD == 'RK4':
+        return run_simulation_rk4(m_buoy, c_pto, buoy_props)
+
     # Define time span based on loaded wave data
-    t_span = [config.WAVE_TIME[0], config.WAVE_TIME[-1]]
+    t_span = [config.T0, config.T1]
     y0 = [0.0, 0.0] # Initial conditions [z, z_dot]
+    options = {}
+    if config.ODE_METHOD in IMPLICIT_METHODS:
+        options['jac'] = make_jacobian(m_buoy, c_pto, buoy_props)
 
     try:
         sol = solve_ivp(
-            buoy_equation_of_motion,
+            make_rhs(m_buoy, c_pto, buoy_props),
             t_span,
             y0,
-            method='RK45',
-            args=(m_buoy, c_pto, buoy_props),
-            dense_output=True,
-            max_step=config.MAX_TIMESTEP
+            method=config.ODE_METHOD,
+            t_eval=config.T_EVAL,
+            max_step=config.MAX_TIMESTEP,
+            **options
         )
         return sol
     
@@ -37,4 +132,35 @@ def run_simulation(m_buoy: float, c_pto: float, buoy_props: BuoyProperties):
         class FailedSolution:
             success = False
             message = str(e)
-        return FailedSolution()
\ No newline at end of file
+        return FailedSolution()
+
+""" Runs a whole population of (mass, damping) pairs as one stacked solve_ivp call (the RK4
+population path is score_population_rk4 in optimization.py) """
+def run_simulation_batch(m_buoy: np.ndarray, c_pto: np.ndarray, buoy_props: BuoyProperties):
+
+    # Stacked state: all positions followed by all velocities
+    t_span = [config.T0, config.T1]
+    y0 = np.zeros(2 * len(m_buoy))
+    options = {}
+    if config.ODE_METHOD in IMPLICIT_METHODS:
+        options['jac'] = make_jacobian_batch(m_buoy, c_pto, buoy_props)
+
+    try:
+        sol = solve_ivp(
+            make_rhs_batch(m_buoy, c_pto, buoy_props),
+            t_span,
+            y0,
+            method=config.ODE_METHOD,
+            t_eval=config.T_EVAL,
+            max_step=config.MAX_TIMESTEP,
+            **options
+        )
+        return sol
+
+    # Return a dummy object with success=False to handle error
+    except Exception as e:
+        logger.error(f"Simulation failed inside run_simulation_batch: {type(e).__name__}: {str(e)}")
+        class FailedSolution:
+            success = False
+            message = str(e)
+        return FailedSolution()
@@ -7,6 +7,9 @@ import os
 DT = 0.2            # sampling intervals (second)
 NS = 6000           # number of data points per file
 NCHAN = 3           # 3 probes
+T_AXIS = np.arange(NS) * DT   # time axis shared by every file
+
+PNG_KWARGS = {'compress_level': 3}   # faster PNG encode for the per-file plots
 
 # ---- output folder ----
 os.makedirs("plots", exist_ok=True)
@@ -14,33 +17,41 @@ os.makedirs("csv", exist_ok=True)
 
 def read_one(fname):
     """read a single .DAT file"""
-    raw = np.fromfile(fname, dtype=np.float32)
-    if raw.size != NCHAN * NS:
-        raise ValueError(f"{fname}: Expected {NCHAN*NS} 个 float32, but got {raw.size}")
-    data = raw.reshape((NCHAN, NS)).T
-    data -= data.mean(axis=0, keepdims=True)
-    return data
+    n_values = os.path.getsize(fname) // np.dtype(np.float32).itemsize
+    if n_values != NCHAN * NS:
+        raise ValueError(f"{fname}: Expected {NCHAN*NS} 个 float32, but got {n_values}")
+    raw = np.memmap(fname, dtype=np.float32, mode="r", shape=(NCHAN, NS))   # paged in by the OS, no read buffer
+    data = raw - raw.mean(axis=1, keepdims=True)   # demean each probe row; the only allocation
+    return data.T                                  # (NS, NCHAN) view, no copy
+
+def make_probe_figure():
+    """build the per-file figure once; its axes and lines are reused for every file"""
+    fig, axs = plt.subplots(NCHAN, 1, figsize=(9, 6))
+    lines = [ax.plot([], [])[0] for ax in axs]
+    for ax in axs:
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel("Wave elevation (m)")
+    return fig, axs, lines
 
-def plot_one(fname, data):
-    """plot wave signals for a single file"""
-    t = np.arange(0, data.shape[0]*DT, DT)
-    plt.figure(figsize=(9, 6))
+def plot_one(fname, data, fig, axs, lines):
+    """plot wave signals for a single file into the reused probe figure"""
     for i in range(NCHAN):
-        plt.subplot(3, 1, i+1)
-        plt.plot(t, data[:, i])
-        plt.title(f"Wave Probe {i+1} — {os.path.basename(fname)}")
-        plt.xlabel("Time (s)")
-        plt.ylabel("Wave elevation (m)")
-    plt.tight_layout()
+        lines[i].set_data(T_AXIS, data[:, i])
+        axs[i].relim()
+        axs[i].autoscale_view()
+        axs[i].set_title(f"Wave Probe {i+1} — {os.path.basename(fname)}")
+    fig.tight_layout()
     out_png = os.path.join("plots", os.path.basename(fname).replace(".DAT", ".png"))
-    plt.savefig(out_png, dpi=150)
-    plt.close()
+    fig.savefig(out_png, dpi=150, pil_kwargs=PNG_KWARGS)
 
-def save_csv(fname, data):
-    t = np.arange(0, data.shape[0]*DT, DT)
-    out_csv = os.path.join("csv", os.path.basename(fname).replace(".DAT", ".csv"))
+def write_csv(out_csv, t, data):
+    """write time + probe columns"""
     header = "time_s,probe1_m,probe2_m,probe3_m"
     np.savetxt(out_csv, np.column_stack([t, data]), delimiter=",", header=header, comments="")
+
+def save_csv(fname, data):
+    out_csv = os.path.join("csv", os.path.basename(fname).replace(".DAT", ".csv"))
+    write_csv(out_csv, T_AXIS, data)
     return out_csv
 
 # ---- main ----
@@ -48,17 +59,18 @@ files = sorted(glob.glob("WV*.DAT"))
 if not files:
     print("No WV*.DAT files found")
 else:
-    all_chunks = []
-    for f in files:
+    # combine all files: each file is written straight into its slice
+    combined = np.empty((len(files)*NS, NCHAN), dtype=np.float32)
+    fig, axs, lines = make_probe_figure()
+    for k, f in enumerate(files):
         d = read_one(f)
-        plot_one(f, d)
+        plot_one(f, d, fig, axs, lines)
         save_csv(f, d)
-        all_chunks.append(d)
+        combined[k*NS:(k+1)*NS] = d
         print(f"Prosessed: {f}")
+    plt.close(fig)
 
-    # combine all files
-    combined = np.vstack(all_chunks)
-    t_full = np.arange(0, combined.shape[0]*DT, DT)
+    t_full = np.arange(combined.shape[0]) * DT
 
     # plot combined wave signals
     plt.figure(figsize=(10, 7))
@@ -69,12 +81,9 @@ else:
         plt.xlabel("Time (s)")
         plt.ylabel("Wave elevation (m)")
     plt.tight_layout()
-    plt.savefig(os.path.join("plots", "combined.png"), dpi=150)
+    plt.savefig(os.path.join("plots", "combined.png"), dpi=150, pil_kwargs=PNG_KWARGS)
     plt.close()
 
     # Save combined CSV
-    header = "time_s,probe1_m,probe2_m,probe3_m"
-    np.savetxt(os.path.join("csv", "combined.csv"),
-               np.column_stack([t_full, combined]),
-               delimiter=",", header=header, comments="")
+    write_csv(os.path.join("csv", "combined.csv"), t_full, combined)
     print("All plots saved in ./plots and CSVs saved in ./csv")
\ No newline at end of file
@@ -5,9 +5,10 @@ Handles loading, cleaning, and interpolating wave data
 """
 import pandas as pd
 import numpy as np
-from scipy.interpolate import interp1d
 import config
 import logging
+from typing import Tuple
+from jit import njit
 
 logger = logging.getLogger(__name__)
 
@@ -16,18 +17,24 @@ def analyze_and_prepare_wave_data(file_path: str, dt_step: float = 0.1) -> bool:
     
     try:
         logger.info(f"Loading wave data from: {file_path}")
-        data = pd.read_csv(file_path, delimiter=',')
+        # Parse only the two columns used, with fixed dtypes (no inference). A callable
+        # usecols leaves missing columns to the explicit check below
+        required = ('Time_s', 'Probe1_Elevation_m')
+        data = pd.read_csv(file_path, delimiter=',', engine='c',
+                           usecols=lambda column: column in required,
+                           dtype={column: np.float64 for column in required})
         
         # Validate required columns
         if 'Time_s' not in data.columns or 'Probe1_Elevation_m' not in data.columns:
             logger.error("CSV must contain 'Time_s' and 'Probe1_Elevation_m' columns")
             return False
         
-        time_coarse = data['Time_s'].to_numpy()
-        wave_vertical_displacement_coarse = data['Probe1_Elevation_m'].to_numpy()
+        time_coarse = data['Time_s'].to_numpy(dtype=np.float64)
+        wave_vertical_displacement_coarse = data['Probe1_Elevation_m'].to_numpy(dtype=np.float64)
         
-        # Remove NaN values
-        valid_indices = ~np.isnan(wave_vertical_displacement_coarse) & ~np.isnan(time_coarse)
+        # Remove NaN (and infinite) values, building the mask in place
+        valid_indices = np.isfinite(wave_vertical_displacement_coarse)
+        np.logical_and(valid_indices, np.isfinite(time_coarse), out=valid_indices)
         time_coarse = time_coarse[valid_indices]
         wave_vertical_displacement_coarse = wave_vertical_displacement_coarse[valid_indices]
         
@@ -35,25 +42,29 @@ def analyze_and_prepare_wave_data(file_path: str, dt_step: float = 0.1) -> bool:
             logger.error("Insufficient valid data points after removing NaN values")
             return False
         
-        config.WAVE_TIME_COARSE = time_coarse
-        config.WAVE_VERTICAL_DISPLACEMENT_COARSE = wave_vertical_displacement_coarse
+        # Contiguous float64 buffers for the compiled forcing lookups
+        config.WAVE_TIME_COARSE = np.ascontiguousarray(time_coarse)
+        config.WAVE_VERTICAL_DISPLACEMENT_COARSE = np.ascontiguousarray(wave_vertical_displacement_coarse)
         
         # Define time boundaries
-        t_start, t_end = time_coarse[0], time_coarse[-1]
+        t_start, t_end = float(time_coarse[0]), float(time_coarse[-1])
+        config.T0, config.T1 = t_start, t_end
         
         # Create high-resolution time array
         num_points_hires = int(np.ceil((t_end - t_start) / dt_step)) + 1
         config.WAVE_TIME = np.linspace(t_start, t_end, num_points_hires)
         
-        # Interpolate wave data using scipy for better performance
-        config.wave_interp = interp1d(
-            time_coarse, 
-            wave_vertical_displacement_coarse,
-            kind='linear',
-            bounds_error=False,
-            fill_value=0.0
-        )
-        config.WAVE_VERTICAL_DISPLACEMENT = config.wave_interp(config.WAVE_TIME)
+        # Linear interpolation of the raw record, zero outside it (np.interp runs as one C loop)
+        def wave_interp(t):
+            return np.interp(t, config.WAVE_TIME_COARSE, config.WAVE_VERTICAL_DISPLACEMENT_COARSE,
+                             left=0.0, right=0.0)
+        config.wave_interp = wave_interp
+        config.WAVE_VERTICAL_DISPLACEMENT = np.interp(config.WAVE_TIME, time_coarse, wave_vertical_displacement_coarse)
+        config.WAVE_DT = (t_end - t_start) / (num_points_hires - 1)
+        
+        # Cache the output sample times and steady-state mask used by every simulation
+        config.T_EVAL = np.linspace(t_start, t_end, config.EVAL_POINTS)
+        config.STEADY_MASK = config.T_EVAL > (t_start + config.STEADY_STATE_CUTOFF)
         
         logger.info(f"Successfully loaded {len(time_coarse)} data points")
         logger.info(f"Resampled to {len(config.WAVE_TIME)} points at dt={dt_step}s")
@@ -66,9 +77,41 @@ def analyze_and_prepare_wave_data(file_path: str, dt_step: float = 0.1) -> bool:
         logger.error(f"Error loading wave data: {type(e).__name__}: {str(e)}")
         return False
 
-""" Calculates the wave forcing at time t """
-def create_forcing_function(t: float, k_hydro: float) -> float:
-    if config.wave_interp is None:
+""" Compiled wave forcing at a single time t on the uniform resampled grid (zero outside the wave record) """
+@njit(cache=True, fastmath=True)
+def wave_forcing(t: float, wave_grid: Tuple[float, float, float], wave_elevation: np.ndarray,
+                 k_hydro: float) -> float:
+    t_start, t_end, dt = wave_grid
+    n = wave_elevation.size
+    if n < 2 or t < t_start or t > t_end:
         return 0.0
-    wave_displacement = config.wave_interp(t)
-    return k_hydro * wave_displacement
\ No newline at end of file
+
+    # Uniform grid, so the interval index is found directly instead of by binary search
+    x = (t - t_start) / dt
+    i = min(int(x), n - 2)
+    f = x - i
+    return k_hydro * (wave_elevation[i] + f * (wave_elevation[i + 1] - wave_elevation[i]))
+
+""" Compiled wave forcing at an array of times (one pass, no temporaries) """
+@njit(cache=True, fastmath=True)
+def wave_forcing_array(t: np.ndarray, wave_grid: Tuple[float, float, float], wave_elevation: np.ndarray,
+                       k_hydro: float) -> np.ndarray:
+    F = np.empty(t.size)
+    for j in range(t.size):
+        F[j] = wave_forcing(t[j], wave_grid, wave_elevation, k_hydro)
+    return F
+
+""" Calculates the wave forcing at time t (scalar or array of times) by direct lookup in the
+uniform resampled table (zero outside the wave record) """
+def create_forcing_function(t, k_hydro: float):
+    if config.wave_interp is None:
+        return np.zeros_like(t, dtype=float) if np.ndim(t) else 0.0
+    wave_grid = (config.T0, config.T1, config.WAVE_DT)
+    if np.ndim(t) == 0:
+        return wave_forcing(float(t), wave_grid, config.WAVE_VERTICAL_DISPLACEMENT, k_hydro)
+    t = np.asarray(t, dtype=np.float64)
+    F = wave_forcing_array(t.ravel(), wave_grid, config.WAVE_VERTICAL_DISPLACEMENT, k_hydro)
+    return F.reshape(t.shape)
+
+# Compile once at import so the first call doesn't pay the JIT cost
+wave_forcing_array(np.zeros(1), (0.0, 1.0, 1.0), np.zeros(2), 0.0)